@@ -1,238 +1,372 @@
 """This module contains the class and methods that parse a java file."""
+import mmap
+import os
 import struct
+from collections import namedtuple
+
+import numpy
+
+from . import class_file_jit
 
 # Disables pylint errors for too many instance methods, too few public methods.
 # pylint: disable=R0902, R0903
 
+# Precompiled big-endian readers, shared by every fixed-width fetch.
+_U1 = struct.Struct(">B")
+_U2 = struct.Struct(">H")
+_U4 = struct.Struct(">I")
+_U8 = struct.Struct(">Q")
+_F = struct.Struct(">f")
+_D = struct.Struct(">d")
+
+def _pool_record(name, type_name, fields):
+    """Build a namedtuple record for one kind of constant pool entry.
+    A record is a fraction of the size of the dict it replaces, and its
+    fields are read by tuple index instead of a hash lookup.
+    """
+    record = namedtuple(name, fields)
+    record.type = type_name
+    return record
+
+
+Utf8 = _pool_record("Utf8", "utf-8", ("value",))
+Integer = _pool_record("Integer", "Integer", ("value",))
+Float = _pool_record("Float", "Float", ("value",))
+Long = _pool_record("Long", "Long", ("value",))
+Double = _pool_record("Double", "Double", ("value",))
+ClassRef = _pool_record("ClassRef", "Class", ("name_index",))
+StringRef = _pool_record("StringRef", "String", ("string_index",))
+Fieldref = _pool_record(
+    "Fieldref", "Fieldref", ("class_index", "name_and_type_index")
+)
+Methodref = _pool_record(
+    "Methodref", "Methodref", ("class_index", "name_and_type_index")
+)
+InterfaceMethodref = _pool_record(
+    "InterfaceMethodref", "InterfaceMethodref", ("class_index", "name_and_type_index")
+)
+NameAndType = _pool_record(
+    "NameAndType", "NameAndType", ("name_index", "descriptor_index")
+)
+MethodHandle = _pool_record(
+    "MethodHandle", "MethodHandle", ("reference_kind", "reference_index")
+)
+MethodType = _pool_record("MethodType", "MethodType", ("descriptor_index",))
+InvokeDynamic = _pool_record(
+    "InvokeDynamic",
+    "InvokeDynamic",
+    ("bootstrap_method_attr_index", "name_and_type_index"),
+)
+
+# Payload sizes and record types for the fixed-width constant pool tags.
+# These entries carry only two-byte indices, so they can be located in one
+# scan pass and decoded in bulk afterwards. Method handles, method types,
+# and invokedynamic (tags 15, 16, 18) only exist from major 51 (JDK 7).
+_TAG_SIZE_V45 = {7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4}
+_TAG_SIZE = dict(_TAG_SIZE_V45)
+_TAG_SIZE.update({16: 2, 18: 4})
+_TAG_RECORDS = {
+    7: ClassRef,
+    8: StringRef,
+    9: Fieldref,
+    10: Methodref,
+    11: InterfaceMethodref,
+    12: NameAndType,
+    16: MethodType,
+    18: InvokeDynamic,
+}
+
 
 class ClassFile:
     """This class reads in a Java .class file and parses its values."""
 
-    def __init__(self, name):
+    def __init__(self, name: str) -> None:
         """Instantiate a ClassFile and read its constants,
         fields, methods, & attributes
         """
         print(name)
-        with open(name, "rb") as binary_file:
-            self.data = bytes(binary_file.read())
-            self.offset = 0
-            self.i_am_code = 0
-            self.run_code = bytearray(0x00)
-            self.magic = get_u4(self)
-            self.minor = int.from_bytes(get_u2(self), byteorder="big")
-            self.major = int.from_bytes(get_u2(self), byteorder="big")
-            # print('About to parse the CONSTANT POOL...')
-            self.pool_count = int.from_bytes(get_u2(self), byteorder="big")
-
-            self.cp_begin = self.offset
-            self.constant_pool = get_constant_pool(self)
-
-            self.access_flags = get_u2(self)
-            self.this_class = get_u2(self)
-            self.super_class = get_u2(self)
-
-            # print('About to parse the INTERFACES...')
-            self.interfaces_count = int.from_bytes(get_u2(self), byteorder="big")
-            self.interfaces_begin = self.offset
-            if self.interfaces_count:
-                self.interfaces = get_info(self, self.interfaces_count)
-
-            # print('About to parse the FIELDS...')
-            self.fields_count = int.from_bytes(get_u2(self), byteorder="big")
-            self.fields_begin = self.offset
-            if self.fields_count:
-                self.fields = get_info(self, self.fields_count)
-
-            # print('About to parse the METHODS...')
-            self.methods_count = int.from_bytes(get_u2(self), byteorder="big")
-            self.methods_begin = self.offset
-            if self.methods_count:
-                self.methods = get_info(self, self.methods_count)
-
-            # print('About to parse the CLASS ATTRIBUTES...')
-            self.class_attributes_count = int.from_bytes(get_u2(self), byteorder="big")
-            if self.class_attributes_count:
-                self.class_attributes = get_attributes(
-                    self, self.class_attributes_count
-                )
-
-
-def get_constant_pool(self):
+        file_descriptor = os.open(name, os.O_RDONLY)
+        try:
+            self.data = mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(file_descriptor)
+        self._mv = memoryview(self.data)
+        self.offset = 0
+        self.i_am_code = 0
+        self.run_code_parts = []
+        self.magic = get_u4(self)
+        self.minor = get_u2(self)
+        self.major = get_u2(self)
+        # print('About to parse the CONSTANT POOL...')
+        self.pool_count = get_u2(self)
+
+        self.cp_begin = self.offset
+        self.constant_pool = get_constant_pool(self)
+
+        self.access_flags = get_u2(self)
+        self.this_class = get_u2(self)
+        self.super_class = get_u2(self)
+
+        # print('About to parse the INTERFACES...')
+        self.interfaces_count = get_u2(self)
+        self.interfaces_begin = self.offset
+        if self.interfaces_count:
+            self.interfaces = get_info(self, self.interfaces_count)
+
+        # print('About to parse the FIELDS...')
+        self.fields_count = get_u2(self)
+        self.fields_begin = self.offset
+        if self.fields_count:
+            self.fields = get_info(self, self.fields_count)
+
+        # print('About to parse the METHODS...')
+        self.methods_count = get_u2(self)
+        self.methods_begin = self.offset
+        if self.methods_count:
+            self.methods = get_info(self, self.methods_count)
+
+        # print('About to parse the CLASS ATTRIBUTES...')
+        self.class_attributes_count = get_u2(self)
+        if self.class_attributes_count:
+            self.class_attributes_length, self.class_attributes = get_attributes(
+                self, self.class_attributes_count
+            )
+
+        self.run_code = b"".join(self.run_code_parts)
+        self.run_code_parts.clear()
+
+    def close(self) -> None:
+        """Release the memory-mapped class data."""
+        if not self.data.closed:
+            self._mv.release()
+            self.data.close()
+
+    def __del__(self) -> None:
+        """Make sure the mapping is released with the instance."""
+        try:
+            self.close()
+        except AttributeError:
+            pass
+
+
+class FieldView:
+    """Lazy view of a single field or method record.
+
+    Stores only the record's offset into the class data; the fixed-width
+    header values are decoded on lookup rather than up front.
+    """
+
+    __slots__ = ("_data", "_offset", "attributes")
+
+    _HEADER_OFFSETS = {
+        "access_flags": 0,
+        "name_index": 2,
+        "descriptor_index": 4,
+        "attributes_count": 6,
+    }
+
+    def __init__(self, data, offset, attributes):
+        self._data = data
+        self._offset = offset
+        self.attributes = attributes
+
+    def __getitem__(self, key):
+        if key == "attributes":
+            return self.attributes
+        position = self._offset + self._HEADER_OFFSETS[key]
+        return _U2.unpack_from(self._data, position)[0]
+
+
+def get_constant_pool(self: "ClassFile") -> list:
     """Collect the Constant Pool from a .class file as a list.
     Each constant is in a Python-readable format
     """
-    tag_table = {
-        1: {
-            "type": "utf-8",
-            "value": lambda: get_extended(self).decode("utf-8"),
-        },
-        3: {
-            "type": "Integer",
-            "value": lambda: int.from_bytes(get_u4(self), byteorder="big"),
-        },
-        4: {
-            "type": "Float",
-            "value": lambda: struct.unpack("f", (get_u4(self))),
-        },
-        5: {
-            "type": "Long",
-            "value": lambda: int.from_bytes(get_u8(self), byteorder="big"),
-        },
-        6: {
-            "type": "Double",
-            "value": lambda: struct.unpack("d", get_u8(self)),
-        },
-        7: {
-            "type": "Class",
-            "name_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-        },
-        8: {
-            "type": "String",
-            "string_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-        },
-        9: {
-            "type": "Fieldref",
-            "class_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-            "name_and_type_index": lambda: int.from_bytes(
-                get_u2(self), byteorder="big"
-            ),
-        },
-        10: {
-            "type": "Methodref",
-            "class_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-            "name_and_type_index": lambda: int.from_bytes(
-                get_u2(self), byteorder="big"
-            ),
-        },
-        11: {
-            "type": "InterfaceMethodref",
-            "class_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-            "name_and_type_index": lambda: int.from_bytes(
-                get_u2(self), byteorder="big"
-            ),
-        },
-        12: {
-            "type": "NameAndType",
-            "name_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-            "descriptor_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-        },
-        15: {
-            "type": "MethodHandle",
-            "reference_kind": lambda: get_u1(self),
-            "reference_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-        },
-        16: {
-            "type": "MethodType",
-            "descriptor_index": lambda: int.from_bytes(get_u2(self), byteorder="big"),
-        },
-        18: {
-            "type": "InvokeDynamic",
-            "bootstrap_method_attr_index": lambda: int.from_bytes(
-                get_u2(self), byteorder="big"
-            ),
-            "name_and_type_index": lambda: int.from_bytes(
-                get_u2(self), byteorder="big"
-            ),
-        },
-    }
-    pool = {0: []}
+    data = self._mv
+    pool = [None] * self.pool_count
     pool[0] = self.pool_count
-    for index in range(1, self.pool_count):
-        tag = get_u1(self)
-        constant = tag_table.get(tag, None).copy()
-        for aspect in constant:
-            if aspect != "type":
-                constant[aspect] = constant[aspect]()
-        pool[index] = constant
-        if tag == 1 and constant["value"] == "Code":
-            self.i_am_code = index
-        if tag in [5, 6]:
-            index += 1
+    # Pass one: the scan kernel locates every entry, so Python only has
+    # to decode the variable-length and value-carrying ones. The decode
+    # loop is specialized on the class file's major version and only
+    # branches on the tags that generation can legally contain.
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+    tags, payload_offsets, end_offset = class_file_jit.scan_pool(
+        buffer, self.offset, self.pool_count
+    )
+    self.offset = int(end_offset)
+    decode_entries = _parse_pool_v51 if self.major >= 51 else _parse_pool_v45
+    fixed = decode_entries(self, data, pool, tags, payload_offsets)
+    # Pass two: bulk-decode the two-byte fields of all fixed-width entries
+    # at once instead of one Python-level read per field.
+    if fixed:
+        byte_values = numpy.frombuffer(data, dtype=numpy.uint8).astype(numpy.uint16)
+        by_tag = {}
+        for index, tag, offset in fixed:
+            by_tag.setdefault(tag, []).append((index, offset))
+        for tag, entries in by_tag.items():
+            record = _TAG_RECORDS[tag]
+            offsets = numpy.array([offset for _, offset in entries], dtype=numpy.intp)
+            columns = [
+                (byte_values[offsets + 2 * slot] << 8)
+                | (byte_values[offsets + 2 * slot + 1])
+                for slot in range(len(record._fields))
+            ]
+            for row, (index, _) in enumerate(entries):
+                pool[index] = record._make(int(column[row]) for column in columns)
     return pool
 
 
-def get_info(self, count):
-    """Get the contents of a Field or Method section"""
-    info = {0: {"values_count": count}}
+def _parse_pool_v45(self, data, pool, tags, payload_offsets):
+    """Decode scanned pool entries for class files older than major 51.
+    Those pools predate method handles and invokedynamic, so this loop
+    carries no branches for tags 15, 16, or 18.
+    """
+    fixed = []
+    for index in range(1, self.pool_count):
+        tag = int(tags[index])
+        if tag == 0:
+            # Second slot of a Long or Double entry; nothing lives here.
+            continue
+        offset = int(payload_offsets[index])
+        if tag in _TAG_SIZE_V45:
+            fixed.append((index, tag, offset))
+        elif tag == 1:
+            (length,) = _U2.unpack_from(self.data, offset)
+            value = str(data[offset + 2 : offset + 2 + length], "utf-8")
+            pool[index] = Utf8(value)
+            if value == "Code":
+                self.i_am_code = index
+        elif tag == 3:
+            pool[index] = Integer(_U4.unpack_from(self.data, offset)[0])
+        elif tag == 4:
+            pool[index] = Float(_F.unpack_from(self.data, offset)[0])
+        elif tag == 5:
+            pool[index] = Long(_U8.unpack_from(self.data, offset)[0])
+        elif tag == 6:
+            pool[index] = Double(_D.unpack_from(self.data, offset)[0])
+    return fixed
+
+
+def _parse_pool_v51(self, data, pool, tags, payload_offsets):
+    """Decode scanned pool entries for class files of major 51 (JDK 7)
+    and newer, which may also contain method handle, method type, and
+    invokedynamic constants.
+    """
+    fixed = []
+    for index in range(1, self.pool_count):
+        tag = int(tags[index])
+        if tag == 0:
+            # Second slot of a Long or Double entry; nothing lives here.
+            continue
+        offset = int(payload_offsets[index])
+        if tag in _TAG_SIZE:
+            fixed.append((index, tag, offset))
+        elif tag == 1:
+            (length,) = _U2.unpack_from(self.data, offset)
+            value = str(data[offset + 2 : offset + 2 + length], "utf-8")
+            pool[index] = Utf8(value)
+            if value == "Code":
+                self.i_am_code = index
+        elif tag == 3:
+            pool[index] = Integer(_U4.unpack_from(self.data, offset)[0])
+        elif tag == 4:
+            pool[index] = Float(_F.unpack_from(self.data, offset)[0])
+        elif tag == 5:
+            pool[index] = Long(_U8.unpack_from(self.data, offset)[0])
+        elif tag == 6:
+            pool[index] = Double(_D.unpack_from(self.data, offset)[0])
+        elif tag == 15:
+            pool[index] = MethodHandle(
+                self.data[offset], _U2.unpack_from(self.data, offset + 1)[0]
+            )
+    return fixed
+
+
+def get_info(self: "ClassFile", count: int) -> list:
+    """Get the contents of a Field or Method section as lazy views"""
+    info = [None] * (count + 1)
+    info[0] = {"values_count": count}
     for val in range(1, count + 1):
-        info[val] = {}
-        info[val]["access_flags"] = get_u2(self)
-        info[val]["name_index"] = int.from_bytes(get_u2(self), byteorder="big")
-        info[val]["descriptor_index"] = int.from_bytes(get_u2(self), byteorder="big")
-        info[val]["attributes_count"] = int.from_bytes(get_u2(self), byteorder="big")
-        info[val]["attributes"] = get_attributes(self, info[val]["attributes_count"])
+        start = self.offset
+        self.offset += 6
+        attributes_count = get_u2(self)
+        info[val] = FieldView(
+            self.data, start, get_attributes(self, attributes_count)[1]
+        )
     return info
 
 
-def get_attributes(self, count):
-    """Get the attributes of a Field, Method, or Class"""
+def get_attributes(self: "ClassFile", count: int) -> tuple:
+    """Get the attributes of a Field, Method, or Class.
+    Returns the total byte length of the section and the attribute list.
+    """
+    total = 0
     attributes = []
-    attributes.append(0)
-    num_attributes = 0
-    if count:
-        while num_attributes < count:
-            attr = get_an_attribute(self)
-            attributes.append(attr)
-            attributes[0] += 6 + attr["length"]
-            num_attributes += 1
-    return attributes
-
-
-def get_an_attribute(self):
+    for _ in range(count):
+        attr = get_an_attribute(self)
+        attributes.append(attr)
+        total += 6 + attr["length"]
+    return (total, attributes)
+
+
+def get_an_attribute(self: "ClassFile") -> dict:
     """Return the index, length, and info of a
     single attribute as a dictionary
     """
     attribute = {}
-    attribute["name_index"] = int.from_bytes(get_u2(self), byteorder="big")
-    attribute["length"] = int.from_bytes(get_u4(self), byteorder="big")
+    attribute["name_index"] = get_u2(self)
+    attribute["length"] = get_u4(self)
     # print(attribute['length'])
-    attribute["info"] = get_extended(self, length=attribute["length"])
+    attribute["info_offset"] = self.offset
+    attribute["info"] = None
     # # WANGLE OUT CODE ATTRIBUTES
     if attribute["name_index"] == self.i_am_code:
-        self.run_code.extend(attribute["info"])
+        self.run_code_parts.append(
+            self._mv[self.offset : self.offset + attribute["length"]]
+        )
+    self.offset += attribute["length"]
     return attribute
 
 
-def get_u1(self):
+def get_u1(self: "ClassFile") -> int:
     """Fetch a single-byte value from the class data"""
-    value = self.data[self.offset]
+    (value,) = _U1.unpack_from(self.data, self.offset)
     self.offset += 1
     # print('Fetched',value)
     return value
 
 
-def get_u2(self):
+def get_u2(self: "ClassFile") -> int:
     """Fetch a two-byte value from the class data"""
-    value = self.data[self.offset : self.offset + 2]
+    (value,) = _U2.unpack_from(self.data, self.offset)
     self.offset += 2
     # print('Fetched',value)
     return value
 
 
-def get_u4(self):
+def get_u4(self: "ClassFile") -> int:
     """Fetch a four-byte value from the class data"""
-    value = self.data[self.offset : self.offset + 4]
+    (value,) = _U4.unpack_from(self.data, self.offset)
     self.offset += 4
     # print('Fetched',value)
     return value
 
 
-def get_u8(self):
+def get_u8(self: "ClassFile") -> int:
     """Fetch an eight-byte value from the class data"""
-    value = self.data[self.offset : self.offset + 8]
+    (value,) = _U8.unpack_from(self.data, self.offset)
     self.offset += 8
     # print('Fetched',value)
     return value
 
 
-def get_extended(self, length=0):
-    """Fetch a variable-length value from the class data.
-    If no length value is supplied, assume the first two bytes
-    of the target value represent its length.
+def get_extended(self: "ClassFile", length: int = 0) -> memoryview:
+    """Fetch a variable-length value from the class data as a zero-copy
+    memoryview. If no length value is supplied, assume the first two
+    bytes of the target value represent its length.
     """
     if not length:
-        length = int.from_bytes(get_u2(self), byteorder="big")
-    value = self.data[self.offset : self.offset + length]
+        length = get_u2(self)
+    value = self._mv[self.offset : self.offset + length]
     self.offset += length
     # print('Fetched',value)
     return value
@@ -0,0 +1,50 @@
+"""Compiled scan kernel for the ClassFile constant pool parser."""
+import numpy
+
+# numba is optional; without it the scan below runs interpreted.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def scan_pool(data, offset, pool_count):
+    """Walk the constant pool tags in a uint8 view of the class data.
+
+    Returns the tag and payload offset of every pool entry plus the
+    offset of the first byte past the pool, leaving all value decoding
+    to the caller.
+    """
+    tags = numpy.zeros(pool_count, dtype=numpy.int64)
+    payload_offsets = numpy.zeros(pool_count, dtype=numpy.int64)
+    index = 1
+    while index < pool_count:
+        tag = numpy.int64(data[offset])
+        offset += 1
+        tags[index] = tag
+        payload_offsets[index] = offset
+        if tag == 1:
+            length = (numpy.int64(data[offset]) << 8) | numpy.int64(
+                data[offset + 1]
+            )
+            offset += 2 + length
+            index += 1
+        elif tag == 5 or tag == 6:
+            # Longs and Doubles occupy two pool slots; the second slot
+            # holds no entry of its own.
+            offset += 8
+            index += 2
+        elif tag == 15:
+            offset += 3
+            index += 1
+        elif tag == 7 or tag == 8 or tag == 16:
+            offset += 2
+            index += 1
+        else:
+            offset += 4
+            index += 1
+    return tags, payload_offsets, offset
+
+
+if njit is not None:
+    scan_pool = njit(cache=True)(scan_pool)
@@ -20,7 +20,7 @@ class MethodTable:
     def call(self, method):
         """ Implement the call method. """
         self.method = method
-        return self.table[self.method["method_name"]["value"]](self)
+        return self.table[self.method["method_name"].value](self)
 
 
 def println(self):
@@ -36,7 +36,7 @@ def init(self):
     """
     self.stack.pop_op()
     self.stack.pop_op()
-    self.stack.push_op(self.method["class_name"]["value"])
+    self.stack.push_op(self.method["class_name"].value)
 
 
 def next_int(self):
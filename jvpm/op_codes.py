@@ -496,27 +496,23 @@ def getstatic(self, index_byte_1, index_byte_2):
 def ldc(self, index):
     """Push a constant from the Pool onto the stack."""
     constant = self.class_data.constant_pool[index]
-    if constant["type"] == "String":
-        string_index = self.class_data.constant_pool[index]["string_index"]
+    if constant.type == "String":
+        string_index = constant.string_index
         self.stack.push_op(
-            self.class_data.constant_pool[string_index]["value"]
+            self.class_data.constant_pool[string_index].value
         )
 
 
 def invokevirtual(self, index_byte_1, index_byte_2):
     """ Implement invokevirtual opcode. """
     index = (index_byte_1 << 8) + index_byte_2
-    class_index = self.class_data.constant_pool[index]["class_index"]
-    name_and_type_index = self.class_data.constant_pool[index][
-        "name_and_type_index"
-    ]
-    class_name_index = self.class_data.constant_pool[class_index]["name_index"]
-    method_name_index = self.class_data.constant_pool[name_and_type_index][
-        "name_index"
-    ]
-    method_descriptor_index = self.class_data.constant_pool[
-        name_and_type_index
-    ]["descriptor_index"]
+    method_ref = self.class_data.constant_pool[index]
+    class_index = method_ref.class_index
+    name_and_type_index = method_ref.name_and_type_index
+    class_name_index = self.class_data.constant_pool[class_index].name_index
+    name_and_type = self.class_data.constant_pool[name_and_type_index]
+    method_name_index = name_and_type.name_index
+    method_descriptor_index = name_and_type.descriptor_index
     class_name = self.class_data.constant_pool[class_name_index]
     method_name = self.class_data.constant_pool[method_name_index]
     method_descriptor = self.class_data.constant_pool[method_descriptor_index]
@@ -541,9 +537,9 @@ def new(self, index_byte_1, index_byte_2):
 
     index = (index_byte_1 << 8) + index_byte_2
     # print(self.class_data.constant_pool[index])
-    name_index = self.class_data.constant_pool[index]["name_index"]
+    name_index = self.class_data.constant_pool[index].name_index
     # print(self.class_data.constant_pool[name_index])
-    self.stack.push_op(self.class_data.constant_pool[name_index]["value"])
+    self.stack.push_op(self.class_data.constant_pool[name_index].value)
 
 
 def dup(self):
@@ -48,7 +48,7 @@ class TestClassFile(unittest.TestCase):
 
     def test_fixed_values(self):
         """Check the set values of the Magic number and the Major and Minor version."""
-        self.assertEqual(self.class_file.magic, b"\xca\xfe\xba\xbe")
+        self.assertEqual(self.class_file.magic, 0xCAFEBABE)
         self.assertEqual(self.class_file.minor, 0)
         self.assertEqual(self.class_file.major, 56)
 
@@ -65,5 +65,5 @@ class TestClassFile(unittest.TestCase):
     def test_get_u8(self):
         """ Test the get_u8 method. """
         self.class_file.offset = 0
-        bytes = get_u8(self.class_file)
-        self.assertEqual(bytes, b"\xca\xfe\xba\xbe\x00\x00\x00\x38")
+        value = get_u8(self.class_file)
+        self.assertEqual(value, 0xCAFEBABE00000038)